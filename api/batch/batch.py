@@ -0,0 +1,75 @@
+"""
+Batch execution tool for LaDiSales.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+from mcp.server.fastmcp import FastMCP
+
+def register_batch_tools(mcp: FastMCP):
+    """Register the batch execution tool with the MCP server."""
+
+    @mcp.tool()
+    async def batch_execute(
+        operations: List[Dict[str, Any]],
+        max_concurrent: int = 8,
+        stop_on_error: bool = False,
+        timeout_ms: int = 30000
+    ) -> List[Dict]:
+        """
+        Execute several tool calls in a single request.
+        
+        Operations run concurrently (at most `max_concurrent` at a time) and
+        their results are returned together, in the same order as `operations`.
+        
+        Args:
+            operations: List of tool calls, each in the form
+                {
+                    "tool": str,        # Name of the tool to call
+                    "arguments": Dict   # Arguments for the tool (optional)
+                }
+            max_concurrent: Maximum number of operations running at once (default: 8)
+            stop_on_error: Skip operations not yet started once one fails (default: False)
+            timeout_ms: Time limit for each operation, in milliseconds (default: 30000)
+        
+        Returns:
+            List with one entry per operation:
+            - tool: Name of the tool called
+            - success: Whether the call succeeded
+            - result: The tool's result (when successful)
+            - error: Error message (when failed or skipped)
+            
+        Example:
+            batch_execute([
+                {"tool": "get_product", "arguments": {"product_id": 101}},
+                {"tool": "get_product", "arguments": {"product_id": 102}},
+                {"tool": "list_state", "arguments": {"country_code": "VN"}}
+            ])
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        failed = asyncio.Event()
+        results: List[Optional[Dict]] = [None] * len(operations)
+
+        async def run_one(index: int, operation: Dict[str, Any]) -> None:
+            tool = operation.get("tool")
+            async with semaphore:
+                if stop_on_error and failed.is_set():
+                    results[index] = {"tool": tool, "success": False, "error": "Skipped after an earlier error"}
+                    return
+                try:
+                    if tool == "batch_execute":
+                        raise ValueError("batch_execute cannot be nested")
+                    result = await asyncio.wait_for(
+                        mcp._tool_manager.call_tool(tool, operation.get("arguments") or {}),
+                        timeout=timeout_ms / 1000
+                    )
+                    results[index] = {"tool": tool, "success": True, "result": result}
+                except asyncio.TimeoutError:
+                    failed.set()
+                    results[index] = {"tool": tool, "success": False, "error": f"Timed out after {timeout_ms} ms"}
+                except Exception as e:
+                    failed.set()
+                    results[index] = {"tool": tool, "success": False, "error": str(e)}
+
+        await asyncio.gather(*(run_one(index, operation) for index, operation in enumerate(operations)))
+        return results
\ No newline at end of file
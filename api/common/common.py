@@ -2,14 +2,25 @@
 Common utilities and configurations for LaDiSales API.
 """
 
-from typing import Dict
-import requests
+import asyncio
+import functools
+import inspect
+import logging
+import ssl
+from typing import Awaitable, Callable, Dict, List, MutableMapping, Optional, Set, Union
+import certifi
+import httpx
+import orjson
+from cachetools import TTLCache
+from cachetools.keys import hashkey
 import os
 from dotenv import load_dotenv
 
-# Load environment variables
+# Load environment variables (variables already set take precedence over .env)
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # API Configuration
 BASE_URL = "https://apiv5.sales.ldpform.net/2.0/api"
 BASE_LOCATION_URL = "https://apiv5.sales.ldpform.net/2.0/public"
@@ -18,17 +29,329 @@ API_KEY = os.getenv("API_KEY")
 if not API_KEY:
     raise ValueError("API_KEY environment variable is not set")
 
+# TLS certificate verification (VERIFY_SSL=false disables it, e.g. behind an
+# intercepting proxy). SSL_CA_BUNDLE pins a custom CA bundle instead of certifi's.
+VERIFY_SSL = os.getenv("VERIFY_SSL", "true").strip().lower() not in ("0", "false", "no")
+SSL_CA_BUNDLE = os.getenv("SSL_CA_BUNDLE")
+
 headers = {
     "Api-Key": API_KEY,
-    "Content-Type": "application/json"
+    "Content-Type": "application/json",
+    "Accept": "application/json",
+    # Let the API compress JSON-heavy list/search responses (br is decoded by
+    # httpx through the brotli package)
+    "Accept-Encoding": "gzip, deflate, br"
 }
 
-def handle_api_response(response: requests.Response) -> Dict:
+# Connection pool sizing. Every endpoint lives on the same host, so a single
+# pool is used; it must be large enough to keep a connection per concurrent
+# tool call, otherwise overflow requests pay a full handshake again. The
+# keep-alive limit covers the fan-out of batch_execute and the bulk tools
+# running side by side.
+MAX_CONNECTIONS = 128
+MAX_KEEPALIVE_CONNECTIONS = 64
+
+# Retry policy. Connection failures are retried by the transport itself;
+# 503 Service Unavailable (the request was refused, not processed) is retried
+# with exponential backoff, honouring Retry-After. Other 5xx statuses, 502 and
+# 504 included, are not retried: the API may already have run the request and
+# the POST endpoints are not idempotent.
+RETRIES = 3
+RETRY_BACKOFF_FACTOR = 0.3
+RETRY_STATUSES = frozenset({503})
+# Longest wait (seconds) before a retry; a longer Retry-After returns the 503
+MAX_RETRY_DELAY = 5.0
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper that retries RETRY_STATUSES responses with backoff."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(RETRIES + 1):
+            response = await self._transport.handle_async_request(request)
+            if response.status_code not in RETRY_STATUSES or attempt == RETRIES:
+                return response
+
+            try:
+                delay = max(0.0, float(response.headers.get("Retry-After", "")))
+            except ValueError:
+                delay = RETRY_BACKOFF_FACTOR * (2 ** attempt)
+            # Give up rather than hold the tool call for a long Retry-After
+            if delay > MAX_RETRY_DELAY:
+                return response
+
+            await response.aclose()
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+# Shared async HTTP/2 client used by every tool: concurrent tool calls reuse
+# pooled keep-alive connections, are multiplexed as streams over one connection
+# and never block the event loop while waiting on the API. Created on first use
+# (building its SSL context is slow) and closed by the server entry point.
+_client: Optional[httpx.AsyncClient] = None
+_ssl_context: Optional[ssl.SSLContext] = None
+
+def get_ssl_verify() -> Union[ssl.SSLContext, bool]:
+    """
+    Return the TLS verification setting for the HTTP client.
+    
+    The SSL context (loading the CA bundle is the slow part) is built once and
+    reused, including by a client recreated after close_client().
+    
+    Returns:
+        Union[ssl.SSLContext, bool]: The shared SSL context, or False when
+        verification is disabled
+    """
+    global _ssl_context
+    if not VERIFY_SSL:
+        return False
+    if _ssl_context is None:
+        _ssl_context = ssl.create_default_context(cafile=SSL_CA_BUNDLE or certifi.where())
+    return _ssl_context
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Return the shared async HTTP client, creating it on first use.
+    
+    Returns:
+        httpx.AsyncClient: Client configured with the API base URL, headers,
+        connection pool limits and retry policy
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            verify=get_ssl_verify(),
+            retries=RETRIES,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS
+            )
+        )
+        _client = httpx.AsyncClient(
+            base_url=BASE_URL,
+            headers=headers,
+            timeout=30.0,
+            transport=RetryTransport(transport)
+        )
+    return _client
+
+# Strong references to detached requests so they are not garbage collected
+# before they complete
+_background_tasks: Set[asyncio.Task] = set()
+
+def _on_detached_done(task: asyncio.Task) -> None:
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Detached API request failed: %s", task.exception())
+
+def run_detached(request: Awaitable[Dict]) -> None:
+    """
+    Run an API request in the background without waiting for its response.
+    
+    Failures are logged. Pending requests are awaited by close_client() so they
+    are not lost on shutdown.
+    
+    Args:
+        request: Coroutine performing the request
+    """
+    task = asyncio.ensure_future(request)
+    _background_tasks.add(task)
+    task.add_done_callback(_on_detached_done)
+
+async def close_client() -> None:
+    """
+    Close the shared HTTP client and its pooled connections, if it was created.
+    
+    Detached requests still in flight are awaited first.
+    """
+    global _client
+    if _background_tasks:
+        await asyncio.gather(*_background_tasks, return_exceptions=True)
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+# Cleanup functions registered by tool namespaces, run by the server entry
+# point on shutdown
+_shutdown_hooks: List[Callable[[], None]] = []
+
+def on_shutdown(hook: Callable[[], None]) -> None:
+    """
+    Register a function to run when the server shuts down.
+    
+    Args:
+        hook: Function called by run_shutdown_hooks()
+    """
+    _shutdown_hooks.append(hook)
+
+def run_shutdown_hooks() -> None:
+    """Run the functions registered with on_shutdown(), in registration order."""
+    for hook in _shutdown_hooks:
+        hook()
+
+# Short-lived cache for idempotent read tools, keyed with cachetools.keys.hashkey.
+# Write tools drop the entries they invalidate with invalidate().
+READ_CACHE = TTLCache(maxsize=1024, ttl=60)
+
+# Fetches of cache entries still in flight, by cache key, so concurrent
+# identical calls (e.g. duplicates in a batch_execute) share one API request
+_inflight: Dict[tuple, asyncio.Task] = {}
+
+def _on_fetch_done(key: tuple, task: asyncio.Task) -> None:
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if not task.cancelled():
+        # Mark the exception retrieved; the callers awaiting the fetch get it
+        task.exception()
+
+async def cached_call(
+    cache: MutableMapping,
+    key: tuple,
+    fetch: Callable[[], Awaitable[Dict]]
+) -> Dict:
+    """
+    Return cache[key], fetching and storing it on a miss.
+    
+    Concurrent misses on the same key wait for a single fetch. The fetch is
+    shielded, so a caller being cancelled (e.g. a batch_execute timeout) does
+    not cancel it for the others.
+    
+    Args:
+        cache: Cache holding the results
+        key: Cache key, built with cachetools.keys.hashkey
+        fetch: Coroutine function requesting the value from the API
+    """
+    if key in cache:
+        return cache[key]
+
+    task = _inflight.get(key)
+    if task is None:
+        async def fetch_into_cache() -> Dict:
+            result = await fetch()
+            # Only store the result if the entry was not invalidated meanwhile
+            if _inflight.get(key) is task:
+                cache[key] = result
+            return result
+
+        task = asyncio.ensure_future(fetch_into_cache())
+        _inflight[key] = task
+        task.add_done_callback(functools.partial(_on_fetch_done, key))
+    return await asyncio.shield(task)
+
+def invalidate(cache: MutableMapping, key: tuple) -> None:
+    """
+    Drop a cache entry after a write.
+    
+    A fetch of the entry still in flight is detached as well: its result may
+    predate the write, so it is neither stored nor shared with later calls.
+    
+    Args:
+        cache: Cache holding the entry
+        key: Cache key, built with cachetools.keys.hashkey
+    """
+    cache.pop(key, None)
+    _inflight.pop(key, None)
+
+def invalidate_tool(cache: MutableMapping, tool: str) -> None:
+    """
+    Drop every entry of a tool, e.g. all cached list pages, like invalidate().
+    
+    Args:
+        cache: Cache holding the entries
+        tool: Tool name, the first element of the entries' keys
+    """
+    for key in [key for key in (*cache, *_inflight) if key[0] == tool]:
+        invalidate(cache, key)
+
+def cached_tool(cache: MutableMapping = READ_CACHE):
+    """
+    Decorator caching the result of an idempotent async read tool.
+    
+    Entries are keyed with hashkey(tool name, *argument values), the arguments
+    being bound to the tool's signature with defaults applied, so
+    get_product(5) is stored under hashkey("get_product", 5) whichever way it
+    was called. Write tools invalidate entries with invalidate() on that key.
+    Concurrent identical calls share one request (see cached_call).
+    
+    Args:
+        cache: Cache holding the results (default: READ_CACHE)
+    """
+    def decorator(fn: Callable[..., Awaitable[Dict]]) -> Callable[..., Awaitable[Dict]]:
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs) -> Dict:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = hashkey(fn.__name__, *bound.arguments.values())
+            return await cached_call(cache, key, functools.partial(fn, *args, **kwargs))
+        return wrapper
+    return decorator
+
+async def warm_up_connections() -> None:
+    """
+    Open a keep-alive connection to the API before the first tool call.
+    
+    Sends a HEAD request so the TCP and TLS handshakes happen at startup without
+    running a real API query. BASE_URL and BASE_LOCATION_URL share one origin,
+    so a single connection serves every tool. Failures and error statuses are
+    ignored since this only primes the connection pool.
+    """
+    try:
+        await get_client().head(BASE_URL, timeout=5)
+    except httpx.HTTPError:
+        pass
+
+async def run_bulk(
+    items: List[Dict],
+    create_one: Callable[[Dict], Awaitable[Dict]],
+    concurrency: int = 10
+) -> Dict:
+    """
+    Run create_one for every item concurrently, at most `concurrency` at a time.
+    
+    Args:
+        items: Payloads to submit
+        create_one: Coroutine function sending a single item to the API
+        concurrency: Maximum number of requests in flight
+        
+    Returns:
+        Dict with the number of successful and failed items and the errors of
+        the failed ones ({"index": position in items, "error": message})
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(item: Dict) -> Dict:
+        async with semaphore:
+            return await create_one(item)
+
+    results = await asyncio.gather(
+        *(run_one(item) for item in items),
+        return_exceptions=True
+    )
+
+    errors = [
+        {"index": index, "error": str(result)}
+        for index, result in enumerate(results)
+        if isinstance(result, Exception)
+    ]
+    return {
+        "success": len(results) - len(errors),
+        "failed": len(errors),
+        "errors": errors
+    }
+
+def handle_api_response(response: httpx.Response) -> Dict:
     """
     Handle API response and raise exceptions if needed.
     
     Args:
-        response: The response object from requests
+        response: The response object from httpx
         
     Returns:
         Dict: The JSON response data if successful
@@ -36,20 +359,6 @@ def handle_api_response(response: requests.Response) -> Dict:
     Raises:
         Exception: If the response status code is >= 400
     """
-    try:
-        if response.status_code >= 400:
-            raise Exception(f"API Error: {response.status_code} - {response.text}")
-        return response.json()
-    except requests.exceptions.SSLError:
-        # Retry without SSL verification if SSL error occurs
-        print("SSL Error occurred. Retrying without verification...")
-        response = requests.request(
-            response.request.method,
-            response.request.url,
-            headers=response.request.headers,
-            json=response.request.body,
-            verify=False
-        )
-        if response.status_code >= 400:
-            raise Exception(f"API Error: {response.status_code} - {response.text}")
-        return response.json() 
\ No newline at end of file
+    if response.status_code >= 400:
+        raise Exception(f"API Error: {response.status_code} - {response.text}")
+    return orjson.loads(response.content)
\ No newline at end of file
@@ -2,16 +2,31 @@
 Customer-related API tools for LaDiSales.
 """
 
+from types import MappingProxyType
 from typing import Dict, List, Optional, Any
-import requests
+import orjson
+from cachetools.keys import hashkey
 from mcp.server.fastmcp import FastMCP
-from ..common.common import BASE_URL, headers, handle_api_response
+from ..common.common import READ_CACHE, cached_tool, get_client, handle_api_response, invalidate, invalidate_tool, run_bulk
+
+# Shared read-only defaults for omitted create_customer fields, so no new
+# list/dict is allocated per call (serialized with orjson's default=dict)
+_EMPTY_LIST: tuple = ()
+_EMPTY_DICT = MappingProxyType({})
+
+def _invalidate_customers(customer_id: Optional[str] = None) -> None:
+    """Drop cached customer/customer tag searches and, if given, the customer's details."""
+    if customer_id is not None:
+        invalidate(READ_CACHE, hashkey("get_customer", str(customer_id)))
+    invalidate_tool(READ_CACHE, "search_customers")
+    invalidate_tool(READ_CACHE, "search_customer_tags")
 
 def register_customer_tools(mcp: FastMCP):
     """Register all customer-related tools with the MCP server."""
     
     @mcp.tool()
-    def get_customer(customer_id: str) -> Dict:
+    @cached_tool()
+    async def get_customer(customer_id: str) -> Dict:
         """
         Lấy thông tin chi tiết của một khách hàng cụ thể.
         
@@ -36,15 +51,14 @@ def register_customer_tools(mcp: FastMCP):
             "customer_id": customer_id
         }
         
-        response = requests.post(
-            f"{BASE_URL}/customer/show",
-            headers=headers,
-            json=data
+        response = await get_client().post(
+            "/customer/show",
+            content=orjson.dumps(data)
         )
         return handle_api_response(response)
 
     @mcp.tool()
-    def create_customer(
+    async def create_customer(
         first_name: str,
         last_name: str,
         email: str,
@@ -134,21 +148,22 @@ def register_customer_tools(mcp: FastMCP):
                 "email": email,
                 "phone": phone,
                 "note": note,
-                "tags": tags or [],
-                "custom_fields": custom_fields or [],
-                "address": address or {}
+                "tags": tags if tags is not None else _EMPTY_LIST,
+                "custom_fields": custom_fields if custom_fields is not None else _EMPTY_LIST,
+                "address": address if address is not None else _EMPTY_DICT
             }
         }
         
-        response = requests.post(
-            f"{BASE_URL}/customer/create",
-            headers=headers,
-            json=data
+        response = await get_client().post(
+            "/customer/create",
+            content=orjson.dumps(data, default=dict)
         )
-        return handle_api_response(response)
+        result = handle_api_response(response)
+        _invalidate_customers()
+        return result
 
     @mcp.tool()
-    def update_customer(
+    async def update_customer(
         customer_id: int,
         first_name: Optional[str] = None,
         last_name: Optional[str] = None,
@@ -225,37 +240,34 @@ def register_customer_tools(mcp: FastMCP):
         4. Giá trị trong custom_fields phải phù hợp với data_type tương ứng
         5. Nếu không muốn cập nhật trường nào, có thể bỏ qua trường đó trong request
         """
+        fields = {
+            "first_name": first_name,
+            "last_name": last_name,
+            "email": email,
+            "phone": phone,
+            "note": note,
+            "tags": tags,
+            "custom_fields": custom_fields
+        }
+        
+        # Chỉ thêm các trường được cung cấp vào request
         data = {
             "customer": {
-                "customer_id": customer_id
+                "customer_id": customer_id,
+                **{k: v for k, v in fields.items() if v is not None}
             }
         }
         
-        # Chỉ thêm các trường được cung cấp vào request
-        if first_name is not None:
-            data["customer"]["first_name"] = first_name
-        if last_name is not None:
-            data["customer"]["last_name"] = last_name
-        if email is not None:
-            data["customer"]["email"] = email
-        if phone is not None:
-            data["customer"]["phone"] = phone
-        if note is not None:
-            data["customer"]["note"] = note
-        if tags is not None:
-            data["customer"]["tags"] = tags
-        if custom_fields is not None:
-            data["customer"]["custom_fields"] = custom_fields
-        
-        response = requests.post(
-            f"{BASE_URL}/customer/update",
-            headers=headers,
-            json=data
+        response = await get_client().post(
+            "/customer/update",
+            content=orjson.dumps(data)
         )
-        return handle_api_response(response)
+        result = handle_api_response(response)
+        _invalidate_customers(customer_id)
+        return result
 
     @mcp.tool()
-    def delete_customer(customer_id: int) -> Dict:
+    async def delete_customer(customer_id: int) -> Dict:
         """
         Xóa một khách hàng.
         
@@ -276,12 +288,13 @@ def register_customer_tools(mcp: FastMCP):
             "customer_id": customer_id
         }
         
-        response = requests.post(
-            f"{BASE_URL}/customer/delete",
-            headers=headers,
-            json=data
+        response = await get_client().post(
+            "/customer/delete",
+            content=orjson.dumps(data)
         )
-        return handle_api_response(response)
+        result = handle_api_response(response)
+        _invalidate_customers(customer_id)
+        return result
 
 
         """
@@ -315,9 +328,8 @@ def register_customer_tools(mcp: FastMCP):
                 limit=20
             )
         """
-        response = requests.get(
-            f"{BASE_URL}/customers/search",
-            headers=headers,
+        response = await get_client().get(
+            "/customers/search",
             params={
                 "keyword": keyword,
                 "page": page,
@@ -327,50 +339,6 @@ def register_customer_tools(mcp: FastMCP):
         return handle_api_response(response)
 
 
-        """
-        Import multiple customers in bulk.
-        
-        This tool allows importing multiple customers at once.
-        Each customer in the list should follow the same format as create_customer().
-        
-        Args:
-            customers: List of customer data dictionaries. Each dictionary should contain:
-                - name: Customer name (required)
-                - email: Email address (required, must be unique)
-                - phone: Phone number (required, must be unique)
-                - Other fields are optional
-                
-        Returns:
-            Dict containing:
-            - success: Number of successfully imported customers
-            - failed: Number of failed imports
-            - errors: List of errors for failed imports
-            
-        Example:
-            import_customers([
-                {
-                    "name": "John Doe",
-                    "email": "john@example.com",
-                    "phone": "+1234567890",
-                    "birthday": "1990-01-01",
-                    "gender": "male"
-                },
-                {
-                    "name": "Jane Doe",
-                    "email": "jane@example.com",
-                    "phone": "+0987654321",
-                    "company_name": "Example Corp"
-                }
-            ])
-        """
-        response = requests.post(
-            f"{BASE_URL}/customers/import",
-            headers=headers,
-            json={"customers": customers}
-        )
-        return handle_api_response(response)
-
-
         """
         Delete a customer group.
         
@@ -388,8 +356,61 @@ def register_customer_tools(mcp: FastMCP):
         Example:
             delete_customer_group("group_123")
         """
-        response = requests.delete(
-            f"{BASE_URL}/customers/groups/{group_id}",
-            headers=headers
+        response = await get_client().delete(
+            f"/customers/groups/{group_id}"
         )
-        return handle_api_response(response) 
\ No newline at end of file
+        return handle_api_response(response) 
+
+    @mcp.tool()
+    async def import_customers(customers: List[Dict], concurrency: int = 10) -> Dict:
+        """
+        Nhập nhiều khách hàng cùng lúc.
+        
+        Mỗi khách hàng được tạo bằng một request tới API tạo khách hàng; các request
+        được gửi song song, tối đa `concurrency` request cùng lúc.
+        
+        Args:
+            customers: Danh sách khách hàng, mỗi phần tử có cùng định dạng với
+                tham số của create_customer():
+                - first_name: Tên (bắt buộc)
+                - last_name: Họ (bắt buộc)
+                - email: Địa chỉ email (bắt buộc, phải là duy nhất)
+                - phone: Số điện thoại (bắt buộc, phải là duy nhất)
+                - Các trường khác là tùy chọn
+            concurrency: Số request tạo khách hàng tối đa chạy đồng thời (mặc định: 10)
+                
+        Returns:
+            Dict chứa:
+            - success: Số khách hàng được tạo thành công
+            - failed: Số khách hàng tạo thất bại
+            - errors: Danh sách lỗi của các khách hàng thất bại
+              ({"index": vị trí trong danh sách, "error": nội dung lỗi})
+            
+        Example:
+            import_customers([
+                {
+                    "first_name": "Chu",
+                    "last_name": "Manh",
+                    "email": "example@gmail.com",
+                    "phone": "0983333222"
+                },
+                {
+                    "first_name": "Nguyen",
+                    "last_name": "An",
+                    "email": "an@example.com",
+                    "phone": "0943555666",
+                    "tags": ["Tag"]
+                }
+            ])
+        """
+        async def create_one(customer: Dict) -> Dict:
+            response = await get_client().post(
+                "/customer/create",
+                content=orjson.dumps({"customer": {"ref_type": "ls", **customer}})
+            )
+            return handle_api_response(response)
+
+        result = await run_bulk(customers, create_one, concurrency)
+        if result["success"]:
+            _invalidate_customers()
+        return result
\ No newline at end of file
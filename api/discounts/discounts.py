@@ -2,97 +2,172 @@
 Discount-related API tools for LaDiSales.
 """
 
-from typing import Dict, Optional, Union, List
-import requests
-from datetime import datetime
+import asyncio
+from typing import Dict, Optional, Union, List, TypedDict
+from cachetools.keys import hashkey
+import orjson
 from mcp.server.fastmcp import FastMCP
-from ..common.common import BASE_URL, headers, handle_api_response
+from ..common.common import READ_CACHE, cached_call, get_client, handle_api_response, run_bulk, run_detached
 
 # Constants for discount types
 DISCOUNT_TYPE_FIXED = 1
 DISCOUNT_TYPE_PERCENTAGE = 2
 
-def register_discount_tools(mcp: FastMCP):
-    """Register all discount-related tools with the MCP server."""
+# String forms accepted for the discount type; anything else means fixed
+_TYPE_MAP: Dict[str, int] = {
+    "percentage": DISCOUNT_TYPE_PERCENTAGE,
+    "fixed": DISCOUNT_TYPE_FIXED,
+    str(DISCOUNT_TYPE_PERCENTAGE): DISCOUNT_TYPE_PERCENTAGE,
+    str(DISCOUNT_TYPE_FIXED): DISCOUNT_TYPE_FIXED
+}
 
-    @mcp.tool()
-    def search_product_tags(search: str = "") -> Dict:
-        """
-        Search product tags.
-        
-        Args:
-            search: Search keyword (empty string returns all tags)
-        
-        Returns:
-            Dict containing search results
-        """
-        response = requests.post(
-            f"{BASE_URL}/product-tag/search",
-            headers=headers,
-            json={"search": search},
-            verify=False
-        )
-        return handle_api_response(response)
+def _discount_type(type: Union[int, str]) -> int:
+    """Convert a string discount type to its numeric value."""
+    if isinstance(type, str):
+        return _TYPE_MAP.get(type.lower(), DISCOUNT_TYPE_FIXED)
+    return type
 
-    @mcp.tool()
-    def search_product_variants(search: str = "") -> Dict:
-        """
-        Search product variants.
-        
-        Args:
-            search: Search keyword (empty string returns all variants)
-        
-        Returns:
-            Dict containing search results
-        """
-        response = requests.post(
-            f"{BASE_URL}/product-variant/search",
-            headers=headers,
-            json={"search": search},
-            verify=False
-        )
-        return handle_api_response(response)
+class DiscountPayload(TypedDict):
+    """The "discount" object sent to /discount/create."""
+    name: str
+    code: str
+    type: int
+    value: str
+    apply_to: Dict
+    min_requirement: Dict
+    customer_groups: Dict
+    usage_limit: Optional[int]
+    one_per_customer: int
+    start_date: Optional[str]
+    end_date: Optional[str]
+    rule_type: int
+    allow_promotion: int
 
-    @mcp.tool()
-    def search_customer_tags(search: str = "") -> Dict:
-        """
-        Search customer tags.
-        
-        Args:
-            search: Search keyword (empty string returns all tags)
+def _build_discount_payload(
+    name: str,
+    code: str,
+    type: Union[int, str],
+    value: Union[float, str],
+    apply_to: Optional[Dict[str, int]] = None,
+    min_requirement: Optional[Dict[str, int]] = None,
+    customer_groups: Optional[Dict[str, int]] = None,
+    usage_limit: Optional[int] = None,
+    one_per_customer: int = 1,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    rule_type: int = 1,
+    allow_promotion: int = 1
+) -> Dict[str, DiscountPayload]:
+    """Build the /discount/create request body, filling in the API defaults."""
+    # Set default values
+    if apply_to is None:
+        apply_to = {"1": 1}
+    if min_requirement is None:
+        min_requirement = {"1": 1}
+    if customer_groups is None:
+        customer_groups = {"1": 1}
         
-        Returns:
-            Dict containing search results
-        """
-        response = requests.post(
-            f"{BASE_URL}/customer-tag/search",
-            headers=headers,
-            json={"search": search},
-            verify=False
+    return {
+        "discount": DiscountPayload(
+            name=name,
+            code=code,
+            type=_discount_type(type),
+            value=str(value),
+            apply_to=apply_to,
+            min_requirement=min_requirement,
+            customer_groups=customer_groups,
+            usage_limit=usage_limit,
+            one_per_customer=one_per_customer,
+            start_date=start_date,
+            end_date=end_date,
+            rule_type=rule_type,
+            allow_promotion=allow_promotion
         )
-        return handle_api_response(response)
+    }
 
-    @mcp.tool()
-    def search_customers(search: str = "") -> Dict:
-        """
-        Search customers.
-        
-        Args:
-            search: Search keyword (empty string returns all customers)
-        
-        Returns:
-            Dict containing search results
-        """
-        response = requests.post(
-            f"{BASE_URL}/customer/search",
-            headers=headers,
-            json={"search": search},
-            verify=False
+async def _search(tool: str, path: str, search: str) -> Dict:
+    """Run a cached request against one of the */search endpoints."""
+    async def fetch() -> Dict:
+        response = await get_client().post(
+            path,
+            content=orjson.dumps({"search": search})
         )
         return handle_api_response(response)
+
+    return await cached_call(READ_CACHE, hashkey(tool, search), fetch)
+
+async def _search_batch(tool: str, path: str, searches: List[str]) -> List[Dict]:
+    """Run several searches concurrently, returning results in input order."""
+    unique = list(dict.fromkeys(searches))
+    results = await asyncio.gather(*(_search(tool, path, search) for search in unique))
+    by_search = dict(zip(unique, results))
+    return [by_search[search] for search in searches]
+
+# Search tools as (tool name, endpoint, what is searched, what an empty search
+# returns). Each entry registers the tool and its "<name>_batch" variant.
+_SEARCH_TOOLS = (
+    ("search_product_tags", "/product-tag/search", "product tags", "tags"),
+    ("search_product_variants", "/product-variant/search", "product variants", "variants"),
+    ("search_customer_tags", "/customer-tag/search", "customer tags", "tags"),
+    ("search_customers", "/customer/search", "customers", "customers")
+)
+
+_SEARCH_DOC = """
+Search {label}.
+
+Args:
+    search: Search keyword (empty string returns all {everything})
+
+Returns:
+    Dict containing search results
+"""
+
+_SEARCH_BATCH_DOC = """
+Search {label} for several keywords at once.
+
+The searches are sent concurrently, so resolving many keywords takes
+about as long as a single search.
+
+Args:
+    searches: Search keywords (an empty string returns all {everything})
+
+Returns:
+    List of search results, in the same order as `searches`
+"""
+
+def _register_search_tools(mcp: FastMCP, name: str, path: str, label: str, everything: str):
+    """Register a search tool and its batched variant for one */search endpoint."""
+
+    async def search_tool(search: str = "") -> Dict:
+        return await _search(name, path, search)
+
+    async def search_batch_tool(searches: List[str]) -> List[Dict]:
+        return await _search_batch(name, path, searches)
+
+    search_tool.__name__ = name
+    search_tool.__doc__ = _SEARCH_DOC.format(label=label, everything=everything)
+    search_batch_tool.__name__ = f"{name}_batch"
+    search_batch_tool.__doc__ = _SEARCH_BATCH_DOC.format(label=label, everything=everything)
+
+    mcp.tool()(search_tool)
+    mcp.tool()(search_batch_tool)
+
+async def _delete_discount(discount_id: Union[int, str]) -> Dict:
+    """Send a /discount/delete request."""
+    response = await get_client().post(
+        "/discount/delete",
+        content=orjson.dumps({"discount_id": discount_id})
+    )
+    return handle_api_response(response)
+
+def register_discount_tools(mcp: FastMCP):
+    """Register all discount-related tools with the MCP server."""
+
+    for name, path, label, everything in _SEARCH_TOOLS:
+        _register_search_tools(mcp, name, path, label, everything)
     
     @mcp.tool()
-    def create_discount(
+    async def create_discount(
         name: str,
         code: str,
         type: Union[int, str],
@@ -153,46 +228,64 @@ def register_discount_tools(mcp: FastMCP):
                 allow_promotion=1
             )
         """
-        # Convert string type to number if needed
-        if isinstance(type, str):
-            type = DISCOUNT_TYPE_PERCENTAGE if type.lower() == "percentage" else DISCOUNT_TYPE_FIXED
-            
-        # Set default values
-        if apply_to is None:
-            apply_to = {"1": 1}
-        if min_requirement is None:
-            min_requirement = {"1": 1}
-        if customer_groups is None:
-            customer_groups = {"1": 1}
-            
-        data = {
-            "discount": {
-                "name": name,
-                "code": code,
-                "type": type,
-                "value": str(value),
-                "apply_to": apply_to,
-                "min_requirement": min_requirement,
-                "customer_groups": customer_groups,
-                "usage_limit": usage_limit,
-                "one_per_customer": one_per_customer,
-                "start_date": start_date,
-                "end_date": end_date,
-                "rule_type": rule_type,
-                "allow_promotion": allow_promotion
-            }
-        }
+        data = _build_discount_payload(
+            name=name,
+            code=code,
+            type=type,
+            value=value,
+            apply_to=apply_to,
+            min_requirement=min_requirement,
+            customer_groups=customer_groups,
+            usage_limit=usage_limit,
+            one_per_customer=one_per_customer,
+            start_date=start_date,
+            end_date=end_date,
+            rule_type=rule_type,
+            allow_promotion=allow_promotion
+        )
         
-        response = requests.post(
-            f"{BASE_URL}/discount/create",
-            headers=headers,
-            json=data,
-            verify=False
+        response = await get_client().post(
+            "/discount/create",
+            content=orjson.dumps(data)
         )
         return handle_api_response(response)
 
     @mcp.tool()
-    def update_discount(
+    async def create_discounts_bulk(discounts: List[Dict], concurrency: int = 10) -> Dict:
+        """
+        Tạo nhiều chương trình khuyến mãi/mã giảm giá cùng lúc.
+        
+        Mỗi phần tử được tạo bằng một request tới API tạo discount; các request
+        được gửi song song, tối đa `concurrency` request cùng lúc.
+        
+        Args:
+            discounts (List[Dict]): Danh sách discount, mỗi phần tử có cùng các
+                tham số với create_discount() (name, code, type, value bắt buộc)
+            concurrency (int): Số request tối đa chạy đồng thời (mặc định: 10)
+        
+        Returns:
+            Dict chứa:
+            - success: Số discount được tạo thành công
+            - failed: Số discount tạo thất bại
+            - errors: Danh sách lỗi ({"index": vị trí trong danh sách, "error": nội dung lỗi})
+            
+        Example:
+            create_discounts_bulk([
+                {"name": "Giảm 10%", "code": "SALE10", "type": "percentage", "value": "10"},
+                {"name": "Giảm 20%", "code": "SALE20", "type": "percentage", "value": "20"}
+            ])
+        """
+        async def create_one(discount: Dict) -> Dict:
+            response = await get_client().post(
+                "/discount/create",
+                content=orjson.dumps(_build_discount_payload(**discount))
+            )
+            return handle_api_response(response)
+
+        return await run_bulk(discounts, create_one, concurrency)
+
+    @mcp.tool()
+    async def update_discount(
         discount_id: Union[int, str],
         name: Optional[str] = None,
         code: Optional[str] = None,
@@ -256,55 +349,43 @@ def register_discount_tools(mcp: FastMCP):
             )
         """
         # Convert string type to number if needed
-        if isinstance(type, str):
-            type = DISCOUNT_TYPE_PERCENTAGE if type.lower() == "percentage" else DISCOUNT_TYPE_FIXED
+        if type is not None:
+            type = _discount_type(type)
             
+        fields = {
+            "name": name,
+            "code": code,
+            "type": type,
+            "value": str(value) if value is not None else None,
+            "apply_to": apply_to,
+            "min_requirement": min_requirement,
+            "customer_groups": customer_groups,
+            "usage_limit": usage_limit,
+            "one_per_customer": one_per_customer,
+            "start_date": start_date,
+            "end_date": end_date,
+            "rule_type": rule_type,
+            "allow_promotion": allow_promotion
+        }
+        
         # Build update data with only provided fields
         update_data = {
-            "discount_id": discount_id
+            "discount_id": discount_id,
+            **{k: v for k, v in fields.items() if v is not None}
         }
         
-        if name is not None:
-            update_data["name"] = name
-        if code is not None:
-            update_data["code"] = code
-        if type is not None:
-            update_data["type"] = type
-        if value is not None:
-            update_data["value"] = str(value)
-        if apply_to is not None:
-            update_data["apply_to"] = apply_to
-        if min_requirement is not None:
-            update_data["min_requirement"] = min_requirement
-        if customer_groups is not None:
-            update_data["customer_groups"] = customer_groups
-        if usage_limit is not None:
-            update_data["usage_limit"] = usage_limit
-        if one_per_customer is not None:
-            update_data["one_per_customer"] = one_per_customer
-        if start_date is not None:
-            update_data["start_date"] = start_date
-        if end_date is not None:
-            update_data["end_date"] = end_date
-        if rule_type is not None:
-            update_data["rule_type"] = rule_type
-        if allow_promotion is not None:
-            update_data["allow_promotion"] = allow_promotion
-        
         data = {
             "discount": update_data
         }
         
-        response = requests.post(
-            f"{BASE_URL}/discount/update",
-            headers=headers,
-            json=data,
-            verify=False
+        response = await get_client().post(
+            "/discount/update",
+            content=orjson.dumps(data)
         )
         return handle_api_response(response)
 
     @mcp.tool()
-    def delete_discount(discount_id: Union[int, str]) -> Dict:
+    async def delete_discount(discount_id: Union[int, str]) -> Dict:
         """
         Delete a discount.
         
@@ -317,10 +398,24 @@ def register_discount_tools(mcp: FastMCP):
         Example:
             delete_discount(44)
         """
-        response = requests.post(
-            f"{BASE_URL}/discount/delete",
-            headers=headers,
-            json={"discount_id": discount_id},
-            verify=False
-        )
-        return handle_api_response(response) 
\ No newline at end of file
+        return await _delete_discount(discount_id)
+
+    @mcp.tool()
+    async def delete_discount_detached(discount_id: Union[int, str]) -> Dict:
+        """
+        Delete a discount in the background.
+        
+        Returns as soon as the request is queued, without waiting for the API to
+        confirm the deletion. Use delete_discount when the result is needed.
+        
+        Args:
+            discount_id: ID of the discount to delete
+        
+        Returns:
+            Dict with status "queued" and the discount ID
+            
+        Example:
+            delete_discount_detached(44)
+        """
+        run_detached(_delete_discount(discount_id))
+        return {"status": "queued", "discount_id": discount_id}
\ No newline at end of file
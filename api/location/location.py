@@ -2,16 +2,81 @@
 Location-related API tools for LaDiSales.
 """
 
+import logging
+import os
 from typing import Dict
-import requests
+from cachetools import LRUCache
+from cachetools.keys import hashkey
+import orjson
 from mcp.server.fastmcp import FastMCP
-from ..common.common import BASE_LOCATION_URL, headers, handle_api_response
+from ..common.common import BASE_LOCATION_URL, cached_tool, get_client, handle_api_response, on_shutdown
+
+logger = logging.getLogger(__name__)
+
+# Endpoint URLs, built once at import time (absolute, they are outside the
+# client's BASE_URL)
+_URL_COUNTRY_LIST = f"{BASE_LOCATION_URL}/address/country/list"
+_URL_STATE_LIST = f"{BASE_LOCATION_URL}/address/state/list"
+_URL_DISTRICT_LIST = f"{BASE_LOCATION_URL}/address/district/list"
+_URL_WARD_LIST = f"{BASE_LOCATION_URL}/address/ward/list"
+
+# Administrative divisions practically never change while the server runs, so
+# responses are kept (bounded by entry count, without expiry) until cleared
+# with the clear_location_cache tool.
+_LOCATION_CACHE = LRUCache(maxsize=4096)
+
+# Optional JSON snapshot of the cached responses. When set, the cache is loaded
+# from it at startup, so location tools answer without calling the API, and
+# written back on shutdown with whatever was fetched meanwhile.
+LOCATION_CACHE_FILE = os.getenv("LOCATION_CACHE_FILE")
+
+def load_location_cache() -> int:
+    """
+    Fill the location cache from LOCATION_CACHE_FILE, if it exists.
+    
+    Returns:
+        int: Number of entries loaded
+    """
+    if not LOCATION_CACHE_FILE or not os.path.exists(LOCATION_CACHE_FILE):
+        return 0
+    try:
+        with open(LOCATION_CACHE_FILE, "rb") as f:
+            entries = orjson.loads(f.read())
+        # A list of [[tool, *arguments], response] pairs
+        loaded = {hashkey(*key): value for key, value in entries}
+    except (OSError, ValueError, TypeError) as e:  # ValueError covers invalid JSON
+        logger.warning("Could not load location cache from %s: %s", LOCATION_CACHE_FILE, e)
+        return 0
+
+    _LOCATION_CACHE.update(loaded)
+    return len(loaded)
+
+def save_location_cache() -> None:
+    """
+    Write the location cache to LOCATION_CACHE_FILE.
+    
+    An empty cache (nothing fetched or loaded) leaves the file untouched.
+    """
+    if not LOCATION_CACHE_FILE or not _LOCATION_CACHE:
+        return
+    entries = [[list(key), value] for key, value in _LOCATION_CACHE.items()]
+    tmp_file = f"{LOCATION_CACHE_FILE}.tmp"
+    try:
+        os.makedirs(os.path.dirname(LOCATION_CACHE_FILE) or ".", exist_ok=True)
+        with open(tmp_file, "wb") as f:
+            f.write(orjson.dumps(entries))
+        os.replace(tmp_file, LOCATION_CACHE_FILE)
+    except OSError as e:
+        logger.warning("Could not save location cache to %s: %s", LOCATION_CACHE_FILE, e)
 
 def register_location_tools(mcp: FastMCP):
     """Register all location-related tools with the MCP server."""
+    load_location_cache()
+    on_shutdown(save_location_cache)
     
     @mcp.tool()
-    def list_country() -> Dict:
+    @cached_tool(_LOCATION_CACHE)
+    async def list_country() -> Dict:
         """
         Lấy danh sách các quốc gia.
         
@@ -23,14 +88,14 @@ def register_location_tools(mcp: FastMCP):
         Example:
             list_country()
         """
-        response = requests.post(
-            f"{BASE_LOCATION_URL}/address/country/list",
-            headers=headers
+        response = await get_client().post(
+            _URL_COUNTRY_LIST
         )
         return handle_api_response(response)
 
     @mcp.tool()
-    def list_state(country_code: str) -> Dict:
+    @cached_tool(_LOCATION_CACHE)
+    async def list_state(country_code: str) -> Dict:
         """
         Lấy danh sách các tỉnh/thành phố của một quốc gia.
         
@@ -49,15 +114,15 @@ def register_location_tools(mcp: FastMCP):
             "country_code": country_code
         }
         
-        response = requests.post(
-            f"{BASE_LOCATION_URL}/address/state/list",
-            headers=headers,
-            json=data
+        response = await get_client().post(
+            _URL_STATE_LIST,
+            content=orjson.dumps(data)
         )
         return handle_api_response(response)
 
     @mcp.tool()
-    def list_district(country_code: str, state_id: int) -> Dict:
+    @cached_tool(_LOCATION_CACHE)
+    async def list_district(country_code: str, state_id: int) -> Dict:
         """
         Lấy danh sách các quận/huyện của một tỉnh/thành phố.
         
@@ -78,15 +143,15 @@ def register_location_tools(mcp: FastMCP):
             "state_id": state_id
         }
         
-        response = requests.post(
-            f"{BASE_LOCATION_URL}/address/district/list",
-            headers=headers,
-            json=data
+        response = await get_client().post(
+            _URL_DISTRICT_LIST,
+            content=orjson.dumps(data)
         )
         return handle_api_response(response)
 
     @mcp.tool()
-    def list_ward(country_code: str, state_id: int, district_id: int) -> Dict:
+    @cached_tool(_LOCATION_CACHE)
+    async def list_ward(country_code: str, state_id: int, district_id: int) -> Dict:
         """
         Lấy danh sách các phường/xã của một quận/huyện.
         
@@ -109,9 +174,34 @@ def register_location_tools(mcp: FastMCP):
             "district_id": district_id
         }
         
-        response = requests.post(
-            f"{BASE_LOCATION_URL}/address/ward/list",
-            headers=headers,
-            json=data
+        response = await get_client().post(
+            _URL_WARD_LIST,
+            content=orjson.dumps(data)
         )
         return handle_api_response(response)
+
+    @mcp.tool()
+    async def clear_location_cache() -> Dict:
+        """
+        Xóa bộ nhớ đệm dữ liệu địa giới hành chính (quốc gia, tỉnh/thành phố,
+        quận/huyện, phường/xã) để các lần gọi sau lấy lại dữ liệu mới từ API.
+        Tệp LOCATION_CACHE_FILE (nếu có) cũng bị xóa để lần khởi động sau không
+        nạp lại dữ liệu cũ.
+        
+        Returns:
+            Dict chứa số mục đã bị xóa khỏi bộ nhớ đệm:
+            - cleared: Số mục đã xóa
+            
+        Example:
+            clear_location_cache()
+        """
+        cleared = len(_LOCATION_CACHE)
+        _LOCATION_CACHE.clear()
+        if LOCATION_CACHE_FILE:
+            try:
+                os.remove(LOCATION_CACHE_FILE)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning("Could not remove location cache file %s: %s", LOCATION_CACHE_FILE, e)
+        return {"cleared": cleared}
@@ -3,15 +3,35 @@ Product-related API tools for LaDiSales.
 """
 
 from typing import Dict, List, Optional, Union
-import requests
+import orjson
+from cachetools.keys import hashkey
 from mcp.server.fastmcp import FastMCP
-from ..common.common import BASE_URL, headers, handle_api_response
+from ..common.common import READ_CACHE, cached_tool, get_client, handle_api_response, invalidate, invalidate_tool, run_detached
+
+def _invalidate_products(product_id: Optional[int] = None) -> None:
+    """Drop cached product lists/tag and variant searches and, if given, the product's details."""
+    if product_id is not None:
+        invalidate(READ_CACHE, hashkey("get_product", product_id))
+    invalidate_tool(READ_CACHE, "list_products")
+    invalidate_tool(READ_CACHE, "search_product_tags")
+    invalidate_tool(READ_CACHE, "search_product_variants")
+
+async def _delete_product(product_id: int) -> Dict:
+    """Send a /product/delete request."""
+    response = await get_client().post(
+        "/product/delete",
+        content=orjson.dumps({"product_id": product_id})
+    )
+    result = handle_api_response(response)
+    _invalidate_products(product_id)
+    return result
 
 def register_product_tools(mcp: FastMCP):
     """Register all product-related tools with the MCP server."""
     
     @mcp.tool()
-    def list_products(page: int = 1, limit: int = 10) -> Dict:
+    @cached_tool()
+    async def list_products(page: int = 1, limit: int = 10) -> Dict:
         """
         Get a paginated list of all products.
         
@@ -22,15 +42,15 @@ def register_product_tools(mcp: FastMCP):
         Returns:
             Dict containing list of products
         """
-        response = requests.post(
-            f"{BASE_URL}/product/list",
-            headers=headers,
-            json={"page": page, "limit": limit}
+        response = await get_client().post(
+            "/product/list",
+            content=orjson.dumps({"page": page, "limit": limit})
         )
         return handle_api_response(response)
 
     @mcp.tool()
-    def get_product(product_id: int) -> Dict:
+    @cached_tool()
+    async def get_product(product_id: int) -> Dict:
         """
         Get detailed information about a specific product.
         
@@ -40,15 +60,14 @@ def register_product_tools(mcp: FastMCP):
         Returns:
             Dict containing product details
         """
-        response = requests.post(
-            f"{BASE_URL}/product/show",
-            headers=headers,
-            json={"product_id": product_id}
+        response = await get_client().post(
+            "/product/show",
+            content=orjson.dumps({"product_id": product_id})
         )
         return handle_api_response(response)
 
     @mcp.tool()
-    def create_product(
+    async def create_product(
         name: str,
         alias_name: str,
         description: str = "",
@@ -140,15 +159,16 @@ def register_product_tools(mcp: FastMCP):
             }
         }
         
-        response = requests.post(
-            f"{BASE_URL}/product/create",
-            headers=headers,
-            json=data
+        response = await get_client().post(
+            "/product/create",
+            content=orjson.dumps(data)
         )
-        return handle_api_response(response)
+        result = handle_api_response(response)
+        _invalidate_products()
+        return result
 
     @mcp.tool()
-    def update_product(
+    async def update_product(
         product_id: int,  # Required
         name: str,  # Required
         alias_name: str,  # Required
@@ -248,47 +268,48 @@ def register_product_tools(mcp: FastMCP):
         Returns:
             Dict containing the updated product details
         """
+        fields = (
+            ("product_id", product_id),
+            ("name", name),
+            ("alias_name", alias_name),
+            ("domain", domain),
+            ("path", path),
+            ("payment_redirect_url", payment_redirect_url),
+            ("payment_redirect_after", payment_redirect_after),
+            ("description", description),
+            ("price", price),
+            ("price_compare", price_compare),
+            ("cost_per_item", cost_per_item),
+            ("sku", sku),
+            ("weight", weight),
+            ("weight_unit", weight_unit),
+            ("inventory_checked", inventory_checked),
+            ("quantity", quantity),
+            ("type", type),
+            ("checkout_config_id", checkout_config_id),
+            ("status", status),
+            ("external_link", external_link),
+            ("variants", variants or []),
+            ("tags", tags or []),
+            ("product_up_sells", product_up_sells or []),
+            ("is_publish", is_publish)
+        )
+        
+        # Skip None values (e.g. an omitted checkout_config_id)
         data = {
-            "product": {
-                "product_id": product_id,
-                "name": name,
-                "alias_name": alias_name,
-                "domain": domain,
-                "path": path,
-                "payment_redirect_url": payment_redirect_url,
-                "payment_redirect_after": payment_redirect_after,
-                "description": description,
-                "price": price,
-                "price_compare": price_compare,
-                "cost_per_item": cost_per_item,
-                "sku": sku,
-                "weight": weight,
-                "weight_unit": weight_unit,
-                "inventory_checked": inventory_checked,
-                "quantity": quantity,
-                "type": type,
-                "checkout_config_id": checkout_config_id,
-                "status": status,
-                "external_link": external_link,
-                "variants": variants or [],
-                "tags": tags or [],
-                "product_up_sells": product_up_sells or [],
-                "is_publish": is_publish
-            }
+            "product": {k: v for k, v in fields if v is not None}
         }
         
-        # Remove None values
-        data["product"] = {k: v for k, v in data["product"].items() if v is not None}
-        
-        response = requests.post(
-            f"{BASE_URL}/product/update",
-            headers=headers,
-            json=data
+        response = await get_client().post(
+            "/product/update",
+            content=orjson.dumps(data)
         )
-        return handle_api_response(response)
+        result = handle_api_response(response)
+        _invalidate_products(product_id)
+        return result
 
     @mcp.tool()
-    def delete_product(product_id: int) -> Dict:
+    async def delete_product(product_id: int) -> Dict:
         """
         Delete a product.
         
@@ -298,23 +319,35 @@ def register_product_tools(mcp: FastMCP):
         Returns:
             Dict containing the deletion confirmation
         """
-        response = requests.post(
-            f"{BASE_URL}/product/delete",
-            headers=headers,
-            json={"product_id": product_id}
-        )
-        return handle_api_response(response)
+        return await _delete_product(product_id)
+
+    @mcp.tool()
+    async def delete_product_detached(product_id: int) -> Dict:
+        """
+        Delete a product in the background.
+        
+        Returns as soon as the request is queued, without waiting for the API to
+        confirm the deletion. Use delete_product when the result is needed.
+        
+        Args:
+            product_id: The unique identifier of the product to delete
+        
+        Returns:
+            Dict with status "queued" and the product ID
+        """
+        run_detached(_delete_product(product_id))
+        return {"status": "queued", "product_id": product_id}
 
     @mcp.tool()
-    def list_checkout_configs() -> Dict:
+    @cached_tool()
+    async def list_checkout_configs() -> Dict:
         """
         Get list of available checkout configurations.
         
         Returns:
             Dict containing list of checkout configurations
         """
-        response = requests.post(
-            f"{BASE_URL}/checkout-config/list",
-            headers=headers
+        response = await get_client().post(
+            "/checkout-config/list"
         )
         return handle_api_response(response) 
\ No newline at end of file
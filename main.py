@@ -3,11 +3,33 @@ Main entry point for LaDiSales MCP server.
 This file is responsible for starting and running the MCP server with streamable-http support.
 """
 
+import anyio
 from server import mcp
+from api.common.common import close_client, run_shutdown_hooks, warm_up_connections
+
+# Run on uvloop when the optional "uvloop" extra is installed: its libuv-based
+# event loop dispatches socket I/O and callbacks with less overhead
+try:
+    import uvloop  # noqa: F401
+    BACKEND_OPTIONS = {"use_uvloop": True}
+except ImportError:
+    BACKEND_OPTIONS = {}
+
+async def serve():
+    try:
+        async with anyio.create_task_group() as tg:
+            # Prime the connection pool in the background while the server starts
+            tg.start_soon(warm_up_connections)
+            await mcp.run_streamable_http_async()
+    finally:
+        # Close the shared HTTP client's pooled connections on shutdown
+        await close_client()
+        # Let the registered namespaces clean up (e.g. save the location cache)
+        run_shutdown_hooks()
 
 def main():
     print("🔧 MCP Server is starting with streamable-http support...")
-    mcp.run(transport="streamable-http")
+    anyio.run(serve, backend_options=BACKEND_OPTIONS)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
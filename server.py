@@ -6,19 +6,54 @@ This module provides tools for interacting with the LaDiSales API, including:
 - Product management (create, update, delete, list, search, categories)
 - Customer management (create, update, delete, list, search, groups)
 - Location management (country, state, district, ward lists)
+- Batch execution of several tool calls in one request
 """
 
+import importlib
+import os
+from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
-from api.discounts.discounts import register_discount_tools
-from api.products.products import register_product_tools
-from api.customers.customers import register_customer_tools
-from api.location.location import register_location_tools
+
+# Load .env before reading the settings below (no namespace module, which
+# would load it through api.common, has been imported yet)
+load_dotenv()
+
+# Tool namespaces as (module, registration function). A namespace's module is
+# only imported when the namespace is registered.
+_TOOL_MODULES = {
+    "discounts": ("api.discounts.discounts", "register_discount_tools"),
+    "products": ("api.products.products", "register_product_tools"),
+    "customers": ("api.customers.customers", "register_customer_tools"),
+    "location": ("api.location.location", "register_location_tools"),
+    "batch": ("api.batch.batch", "register_batch_tools")
+}
+
+# Namespaces to register, comma-separated (unset or empty: all of them).
+# Leaving out unused namespaces shrinks the tool list sent to the model on
+# every turn.
+ENABLED_NAMESPACES = [
+    namespace.strip()
+    for namespace in os.getenv("LADISALES_ENABLED_NAMESPACES", "").split(",")
+    if namespace.strip()
+] or list(_TOOL_MODULES)
+
+_unknown = set(ENABLED_NAMESPACES) - set(_TOOL_MODULES)
+if _unknown:
+    raise ValueError(
+        f"Unknown namespaces in LADISALES_ENABLED_NAMESPACES: {', '.join(sorted(_unknown))} "
+        f"(available: {', '.join(_TOOL_MODULES)})"
+    )
 
 # Create an MCP server
 mcp = FastMCP("LaDiSales", host="0.0.0.0", port=8000)
 
-# Register all tools
-register_discount_tools(mcp)
-register_product_tools(mcp)
-register_customer_tools(mcp)
-register_location_tools(mcp)
\ No newline at end of file
+def register_namespace(namespace: str) -> None:
+    """Import a tool namespace's module and register its tools with the server."""
+    module_name, register_name = _TOOL_MODULES[namespace]
+    module = importlib.import_module(module_name)
+    getattr(module, register_name)(mcp)
+
+# Register the enabled tools
+for namespace in _TOOL_MODULES:
+    if namespace in ENABLED_NAMESPACES:
+        register_namespace(namespace)
\ No newline at end of file